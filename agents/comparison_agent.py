@@ -1,20 +1,25 @@
+from typing import Optional
 from .schemas import AgentState, ComparisonTable
 from utils.llm_service import LLMService
+from utils.llm_cassette import CassetteMissError
+from utils.artifact_store import ArtifactStore
 from utils.logger import get_logger
 
 logger = get_logger("ComparisonAgent")
 
 class ComparisonAgent:
-    def __init__(self):
+    def __init__(self, artifacts: Optional[ArtifactStore] = None):
         self.llm = LLMService()
+        self.artifacts = artifacts if artifacts is not None else ArtifactStore()
 
     def compare_node(self, state: AgentState) -> dict:
         logger.info("--- GENERATING COMPARISON DATA ---")
+        product = self.artifacts.get(state.product_data)
         prompt = f"""
         Analyze the following product and generate a comparison table against one generic competitor.
         
-        Product: {state.product_data.name}
-        Details: {state.product_data.specs}
+        Product: {product.name}
+        Details: {product.specs}
         
         Requirements:
         1. Identify 5 key attributes for comparison.
@@ -26,7 +31,9 @@ class ComparisonAgent:
         
         try:
             comparison_data = self.llm.generate_structured_output(prompt, ComparisonTable)
-            return {"comparison_data": comparison_data}
+            return {"comparison_data": self.artifacts.put("comparison_data", comparison_data, scope=state.thread_id)}
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Comparison generation failed: {e}")
             return {"errors": [f"Comparison failed: {e}"]}
@@ -1,7 +1,9 @@
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, Optional
 from .schemas import AgentState
 from utils.llm_service import LLMService
+from utils.llm_cassette import CassetteMissError
+from utils.artifact_store import ArtifactStore
 from utils.logger import get_logger
 
 logger = get_logger("ContentLogicAgent")
@@ -10,15 +12,17 @@ class LogicResponse(BaseModel):
     blocks: Dict[str, str]
 
 class ContentLogicAgent:
-    def __init__(self):
+    def __init__(self, artifacts: Optional[ArtifactStore] = None):
         self.llm = LLMService()
+        self.artifacts = artifacts if artifacts is not None else ArtifactStore()
 
     def extract_node(self, state: AgentState) -> dict:
         logger.info("--- EXTRACTING LOGIC BLOCKS ---")
+        product = self.artifacts.get(state.product_data)
         prompt = f"""
-        Extract the following logic blocks for the product: {state.product_data.name}.
+        Extract the following logic blocks for the product: {product.name}.
         
-        Available Data: {state.product_data.model_dump()}
+        Available Data: {product.model_dump()}
         
         Required Blocks:
         - benefits: Key advantages and USP.
@@ -30,7 +34,9 @@ class ContentLogicAgent:
         
         try:
             res = self.llm.generate_structured_output(prompt, LogicResponse)
-            return {"logic_blocks": res.blocks}
+            return {"logic_blocks": self.artifacts.put("logic_blocks", res.blocks, scope=state.thread_id)}
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Logic extraction failed: {e}")
             return {"errors": [f"Logic extraction failed: {e}"]}
@@ -1,8 +1,8 @@
-import os
 import json
 from typing import TypedDict, List, Dict, Any, Optional
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
 
 from .schemas import AgentState, RawProductInput
 from .product_parser import ProductParserAgent
@@ -12,18 +12,27 @@ from .comparison_agent import ComparisonAgent
 from .quality_checker import QualityCheckerAgent
 from .page_assembler import PageAssemblerAgent
 from utils.logger import get_logger
+from utils.artifact_store import ArtifactRef, ArtifactStore
+from utils.output_sink import SINK_TYPES, DirectorySink, OutputSink, create_sink
 
 logger = get_logger("Orchestrator")
 
 class Orchestrator:
-    def __init__(self):
-        self.parser = ProductParserAgent()
-        self.question_gen = QuestionGenerationAgent()
-        self.content_logic = ContentLogicAgent()
-        self.comparison_agent = ComparisonAgent()
-        self.quality_checker = QualityCheckerAgent()
-        self.assembler = PageAssemblerAgent()
-        self.memory = MemorySaver()
+    def __init__(self, sink: Optional[OutputSink] = None):
+        self.sink = sink if sink is not None else DirectorySink("output")
+        self.artifacts = ArtifactStore()
+        self.parser = ProductParserAgent(self.artifacts)
+        self.question_gen = QuestionGenerationAgent(self.artifacts)
+        self.content_logic = ContentLogicAgent(self.artifacts)
+        self.comparison_agent = ComparisonAgent(self.artifacts)
+        self.quality_checker = QualityCheckerAgent(self.artifacts)
+        self.assembler = PageAssemblerAgent(self.artifacts)
+        self.memory = MemorySaver(
+            serde=JsonPlusSerializer(allowed_msgpack_modules=[
+                (AgentState.__module__, AgentState.__name__),
+                (ArtifactRef.__module__, ArtifactRef.__name__)
+            ])
+        )
         self.builder = self._create_graph()
 
     def validate_input_node(self, state: AgentState) -> dict:
@@ -93,21 +102,49 @@ class Orchestrator:
             logger.info(f"Quality gate FAILED. Retry count: {state.iteration_count}")
             return "retry"
 
-    def run_pipeline(self, input_data: dict, thread_id: str = "default_thread"):
+    def checkpoint_stats(self, thread_id: str) -> List[Dict[str, Any]]:
+        """
+        Approximate checkpoint size per step for a thread, oldest first. Each step's state
+        values are re-serialized with the checkpointer's serde; MemorySaver's stored blobs
+        add per-channel framing and checkpoint metadata on top of this.
+        """
+        config = {"configurable": {"thread_id": thread_id}}
+        stats = []
+        for snapshot in self.builder.get_state_history(config):
+            _, payload = self.memory.serde.dumps_typed(snapshot.values)
+            stats.append({
+                "step": snapshot.metadata.get("step"),
+                "next": list(snapshot.next),
+                "bytes": len(payload)
+            })
+        return list(reversed(stats))
+
+    def run_pipeline(self, input_data: dict, thread_id: str = "default_thread", measure_checkpoints: bool = False):
+        """
+        Runs one product through the graph. The thread's artifacts are released from the
+        store once the pages are written, so the thread cannot be resumed afterwards.
+        Set measure_checkpoints to add per-step checkpoint sizes to metadata["checkpoint_stats"].
+        """
         config = {"configurable": {"thread_id": thread_id}}
-        initial_state = AgentState(raw_input=input_data)
+        # Every field is passed explicitly, so a reused thread never inherits stale
+        # refs or counters from its previous checkpoint.
+        initial_state = AgentState(thread_id=thread_id, raw_input=input_data).model_dump()
         
         logger.info(f"Starting pipeline for thread: {thread_id}")
-        final_state = self.builder.invoke(initial_state, config)
-        
-        # Cleanup output files for terminal reporting
-        if final_state.get("output_files"):
-            for filename, content in final_state["output_files"].items():
-                out_path = os.path.join("output", filename)
-                os.makedirs("output", exist_ok=True)
-                with open(out_path, "w") as f:
-                    json.dump(content, f, indent=2)
-                logger.info(f"Saved: {out_path}")
+        try:
+            final_state = self.artifacts.resolve(self.builder.invoke(initial_state, config))
+
+            if measure_checkpoints:
+                stats = self.checkpoint_stats(thread_id)
+                logger.info(f"Checkpoints: {len(stats)} steps, {sum(s['bytes'] for s in stats)} bytes total")
+                final_state["metadata"] = {**final_state.get("metadata", {}), "checkpoint_stats": stats}
+            
+            if final_state.get("output_files"):
+                # Key on a stable identity so re-runs of a catalog replace earlier output.
+                product_id = input_data.get("id") or input_data.get("sku") or input_data.get("title") or thread_id
+                self.sink.write(str(product_id), input_data.get("title", ""), final_state["output_files"])
+        finally:
+            self.artifacts.release(thread_id)
                 
         return final_state
 
@@ -116,16 +153,26 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", required=True)
     parser.add_argument("--output", default="output/")
+    parser.add_argument("--sink", choices=SINK_TYPES, default="dir")
+    parser.add_argument("--compact", action="store_true", help="Write non-indented JSON pages")
     args = parser.parse_args()
 
     with open(args.input, "r") as f:
         data = json.load(f)
-
-    orch = Orchestrator()
-    results = orch.run_pipeline(data)
-    
-    if results.get("errors"):
-        logger.error(f"Pipeline finished with errors: {results['errors']}")
+    # A catalog file holds a list of products; each gets its own thread.
+    products = data if isinstance(data, list) else [data]
+
+    failed = 0
+    with create_sink(args.sink, args.output, compact=args.compact) as sink:
+        orch = Orchestrator(sink=sink)
+        for index, product in enumerate(products):
+            results = orch.run_pipeline(product, thread_id=f"product_{index}")
+            if results.get("errors"):
+                failed += 1
+                logger.error(f"Pipeline finished with errors for {product.get('title')}: {results['errors']}")
+
+    if failed:
+        logger.error(f"{failed}/{len(products)} products failed.")
         exit(1)
     else:
         logger.info("Pipeline completed successfully.")
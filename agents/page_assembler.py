@@ -1,20 +1,22 @@
-from typing import Any
+from typing import Any, Optional
 from .schemas import AgentState, FAQItem
 from .template_manager import TemplateManager
 from utils.logger import get_logger
+from utils.artifact_store import ArtifactStore
 
 logger = get_logger("PageAssemblerAgent")
 
 class PageAssemblerAgent:
-    def __init__(self):
+    def __init__(self, artifacts: Optional[ArtifactStore] = None):
         self.template_agent = TemplateManager()
+        self.artifacts = artifacts if artifacts is not None else ArtifactStore()
 
     def assemble_node(self, state: AgentState) -> dict:
         logger.info("--- ASSEMBLING OUTPUT PAGES ---")
-        product_data = state.product_data
-        faqs = state.faqs
-        logic_blocks = state.logic_blocks
-        comparison_data = state.comparison_data
+        product_data = self.artifacts.get(state.product_data)
+        faqs = self.artifacts.get(state.faqs, [])
+        logic_blocks = self.artifacts.get(state.logic_blocks, {})
+        comparison_data = self.artifacts.get(state.comparison_data)
         
         if not product_data:
             logger.error("No product data available for assembly.")
@@ -38,9 +40,9 @@ class PageAssemblerAgent:
             
         return {
             "output_files": {
-                "faq.json": faq_page,
-                "product_page.json": product_page,
-                "comparison_page.json": comparison_page
+                "faq.json": self.artifacts.put("page", faq_page, scope=state.thread_id),
+                "product_page.json": self.artifacts.put("page", product_page, scope=state.thread_id),
+                "comparison_page.json": self.artifacts.put("page", comparison_page, scope=state.thread_id)
             }
         }
 
@@ -1,7 +1,10 @@
 import json
+from typing import Optional
 from .schemas import AgentState, ProductData
 from utils.logger import get_logger
 from utils.llm_service import LLMService
+from utils.llm_cassette import CassetteMissError
+from utils.artifact_store import ArtifactStore
 
 # Import the tool
 try:
@@ -12,8 +15,9 @@ except ImportError:
 logger = get_logger("ProductParserAgent")
 
 class ProductParserAgent:
-    def __init__(self):
+    def __init__(self, artifacts: Optional[ArtifactStore] = None):
         self.llm = LLMService()
+        self.artifacts = artifacts if artifacts is not None else ArtifactStore()
 
     def parse_node(self, state: AgentState) -> dict:
         logger.info("--- PARSING PRODUCT DATA ---")
@@ -30,6 +34,8 @@ class ProductParserAgent:
         
         try:
             product_data = self.llm.generate_structured_output(prompt, ProductData)
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"LLM Parsing failed: {e}")
             return {"errors": [f"Parsing failed: {e}"]}
@@ -48,6 +54,6 @@ class ProductParserAgent:
             logger.warning("spec_validator tool is missing/not imported.")
 
         return {
-            "product_data": product_data,
+            "product_data": self.artifacts.put("product_data", product_data, scope=state.thread_id),
             "metadata": {**state.metadata, "spec_validation": validation_result}
         }
@@ -1,6 +1,9 @@
+from typing import Optional
 from pydantic import BaseModel
 from .schemas import AgentState
 from utils.llm_service import LLMService
+from utils.llm_cassette import CassetteMissError
+from utils.artifact_store import ArtifactStore
 from utils.logger import get_logger
 
 logger = get_logger("QualityCheckerAgent")
@@ -10,13 +13,14 @@ class QualityCheckResult(BaseModel):
     feedback: str
 
 class QualityCheckerAgent:
-    def __init__(self):
+    def __init__(self, artifacts: Optional[ArtifactStore] = None):
         self.llm = LLMService()
+        self.artifacts = artifacts if artifacts is not None else ArtifactStore()
 
     def audit_node(self, state: AgentState) -> dict:
         logger.info("--- AUDITING CONTENT QUALITY ---")
         
-        if not state.faqs or len(state.faqs) != 15:
+        if not state.faqs or state.faq_count != 15:
             logger.warning("Deterministic Check Failed: Incorrect FAQ count.")
             return {
                 "quality_feedback": "FAILED: FAQ list must contain exactly 15 items.",
@@ -26,9 +30,9 @@ class QualityCheckerAgent:
         prompt = f"""
         Audit the following generated content for professionalism, accuracy, and formatting.
         
-        FAQs: {state.faqs}
-        Logic Blocks: {state.logic_blocks}
-        Comparison: {state.comparison_data}
+        FAQs: {self.artifacts.get(state.faqs, [])}
+        Logic Blocks: {self.artifacts.get(state.logic_blocks, {})}
+        Comparison: {self.artifacts.get(state.comparison_data)}
         
         If there are formatting errors (like triple newlines or broken strings), mark as is_valid=false.
         Otherwise, if everything looks professional, mark is_valid=true.
@@ -48,6 +52,8 @@ class QualityCheckerAgent:
                 "quality_feedback": "PASSED" if res.is_valid or state.iteration_count >= 2 else res.feedback,
                 "iteration_count": state.iteration_count + 1
             }
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"Auditor Node Failure: {e}")
             return {
@@ -1,21 +1,26 @@
+from typing import Optional
 from .schemas import AgentState, FAQList
 from utils.llm_service import LLMService
+from utils.llm_cassette import CassetteMissError
+from utils.artifact_store import ArtifactStore
 from utils.logger import get_logger
 
 logger = get_logger("QuestionGenerationAgent")
 
 class QuestionGenerationAgent:
-    def __init__(self):
+    def __init__(self, artifacts: Optional[ArtifactStore] = None):
         self.llm = LLMService()
+        self.artifacts = artifacts if artifacts is not None else ArtifactStore()
 
     def generate_node(self, state: AgentState) -> dict:
         logger.info("--- GENERATING FAQS ---")
+        product = self.artifacts.get(state.product_data)
         prompt = f"""
         Generate exactly 15 frequently asked questions and answers for the following product:
         
-        Product: {state.product_data.name}
-        Description: {state.product_data.description}
-        Details: {state.product_data.specs}
+        Product: {product.name}
+        Description: {product.description}
+        Details: {product.specs}
         
         Requirements:
         1. Produce exactly 15 items.
@@ -33,7 +38,12 @@ class QuestionGenerationAgent:
                     "iteration_count": state.iteration_count + 1
                 }
                 
-            return {"faqs": faq_list.items}
+            return {
+                "faqs": self.artifacts.put("faqs", faq_list.items, scope=state.thread_id),
+                "faq_count": len(faq_list.items)
+            }
+        except CassetteMissError:
+            raise
         except Exception as e:
             logger.error(f"FAQ Generation failed: {e}")
             return {
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field, validator
 from typing import List, Dict, Optional, Any
+from utils.artifact_store import ArtifactRef
 
 class FAQItem(BaseModel):
     category: str = Field(description="Category of the question (informational, usage, safety, pricing, comparison)")
@@ -70,12 +71,19 @@ class RawProductInput(BaseModel):
     target_skin_type: List[str] = Field(default_factory=list)
 
 class AgentState(BaseModel):
+    """
+    Graph state checkpointed at every node. Large artifacts live in the
+    ArtifactStore; the state only carries their ArtifactRef handles, scoped
+    to thread_id so they can be released once the run is finished.
+    """
+    thread_id: Optional[str] = None
     raw_input: Dict[str, Any] = Field(default_factory=dict)
-    product_data: Optional[ProductData] = None
-    faqs: List[FAQItem] = Field(default_factory=list)
-    logic_blocks: Dict[str, str] = Field(default_factory=dict)
-    comparison_data: Optional[ComparisonTable] = None
-    output_files: Dict[str, Any] = Field(default_factory=dict)
+    product_data: Optional[ArtifactRef] = None
+    faqs: Optional[ArtifactRef] = None
+    faq_count: int = 0
+    logic_blocks: Optional[ArtifactRef] = None
+    comparison_data: Optional[ArtifactRef] = None
+    output_files: Dict[str, ArtifactRef] = Field(default_factory=dict)
     errors: List[str] = Field(default_factory=list)
     quality_feedback: str = ""
     iteration_count: int = 0
@@ -0,0 +1,96 @@
+import copy
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional, Set
+from pydantic import BaseModel
+from .logger import get_logger
+
+logger = get_logger("ArtifactStore")
+
+class ArtifactRef(BaseModel):
+    """Compact handle to an artifact held outside the graph state."""
+    kind: str
+    digest: str
+    size: int
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _to_jsonable(v) for k, v in value.items()}
+    return value
+
+class ArtifactStore:
+    """
+    Content-addressed side store for large pipeline artifacts.
+    The graph state only carries ArtifactRefs, so checkpoints stay small and
+    unchanged payloads (e.g. product data across retries) are stored once.
+
+    Artifacts are copied on put and get, so callers can never mutate a stored
+    artifact away from its digest. Puts are tagged with a scope (the pipeline
+    thread) and release(scope) drops whatever no other scope still uses.
+    Refs only resolve inside this process's in-memory store; a persistent
+    checkpointer could not resume a thread from them.
+    """
+
+    def __init__(self):
+        self._objects: Dict[str, Any] = {}
+        self._sizes: Dict[str, int] = {}
+        self._owners: Dict[str, Set[Optional[str]]] = {}
+        self._scopes: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, kind: str, value: Any, scope: Optional[str] = None) -> ArtifactRef:
+        payload = json.dumps(_to_jsonable(value), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(payload).hexdigest()
+        with self._lock:
+            if digest not in self._objects:
+                self._objects[digest] = copy.deepcopy(value)
+                self._sizes[digest] = len(payload)
+                self._owners[digest] = set()
+            # Unscoped puts are owned by None and never released.
+            self._owners[digest].add(scope)
+            if scope is not None:
+                self._scopes.setdefault(scope, set()).add(digest)
+        return ArtifactRef(kind=kind, digest=digest, size=len(payload))
+
+    def get(self, ref: Optional[ArtifactRef], default: Any = None) -> Any:
+        if ref is None:
+            return default
+        try:
+            return copy.deepcopy(self._objects[ref.digest])
+        except KeyError:
+            logger.error(f"Artifact {ref.kind}:{ref.digest[:12]} not found in store.")
+            raise KeyError(f"Unknown artifact {ref.kind}:{ref.digest}")
+
+    def resolve(self, value: Any) -> Any:
+        """Recursively replace ArtifactRefs with copies of the artifacts they point to."""
+        if isinstance(value, ArtifactRef):
+            return self.get(value)
+        if isinstance(value, dict):
+            return {k: self.resolve(v) for k, v in value.items()}
+        return value
+
+    def release(self, scope: str) -> int:
+        """Drop a scope's artifacts that no other scope references. Returns the number evicted."""
+        evicted = 0
+        with self._lock:
+            for digest in self._scopes.pop(scope, set()):
+                owners = self._owners.get(digest)
+                if owners is None:
+                    continue
+                owners.discard(scope)
+                if not owners:
+                    del self._objects[digest], self._sizes[digest], self._owners[digest]
+                    evicted += 1
+        return evicted
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self._sizes.values())
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Set
+from .logger import get_logger
+from .fileio import atomic_write
+
+logger = get_logger("LLMCassette")
+
+CASSETTE_MODES = ("off", "record", "replay")
+TEXT_SCHEMA = "text"
+
+class CassetteMissError(RuntimeError):
+    """Raised in replay mode when a prompt has no recorded response."""
+
+def cassette_key(schema_name: str, prompt: str) -> str:
+    return hashlib.sha256(f"{schema_name}\n{prompt}".encode("utf-8")).hexdigest()
+
+class LLMCassette:
+    """
+    JSON file of recorded (schema, prompt) -> response interactions.
+    Each key keeps its responses in call order so retries replay faithfully.
+    The first record of a key in a session replaces its previously recorded responses.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.interactions: Dict[str, Dict[str, Any]] = {}
+        self._recorded_keys: Set[str] = set()
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r") as f:
+            self.interactions = json.load(f).get("interactions", {})
+        logger.info(f"Loaded {len(self.interactions)} cassette interactions from {self.path}")
+
+    def lookup(self, schema_name: str, prompt: str, index: int = 0) -> Dict[str, Any]:
+        """Return the index-th recorded response, repeating the last one once exhausted."""
+        key = cassette_key(schema_name, prompt)
+        entry = self.interactions.get(key)
+        if not entry or not entry["responses"]:
+            logger.error(f"Cassette miss for {schema_name} (key {key[:12]}) in {self.path}")
+            raise CassetteMissError(
+                f"No recorded {schema_name} response for prompt {key[:12]} in cassette {self.path}. "
+                "Re-record with LLM_CASSETTE_MODE=record."
+            )
+        responses = entry["responses"]
+        return responses[min(index, len(responses) - 1)]
+
+    def record(self, schema_name: str, prompt: str, response: Any, latency: float):
+        key = cassette_key(schema_name, prompt)
+        with self._lock:
+            if key not in self._recorded_keys:
+                self.interactions[key] = {"schema": schema_name, "prompt": prompt, "responses": []}
+                self._recorded_keys.add(key)
+            entry = self.interactions[key]
+            entry["responses"].append({"response": response, "latency": round(latency, 3)})
+            self._save()
+
+    def _save(self):
+        atomic_write(self.path, json.dumps({"version": 1, "interactions": self.interactions}, indent=2), fsync=False)
+
+_cassettes: Dict[str, LLMCassette] = {}
+_cassettes_lock = threading.Lock()
+
+def get_cassette(path: str) -> LLMCassette:
+    """Shared cassette per file, so all agents record into (and replay from) one place."""
+    path = os.path.abspath(path)
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = LLMCassette(path)
+        return _cassettes[path]
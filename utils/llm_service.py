@@ -1,11 +1,12 @@
 import os
 import time
-from typing import Type, TypeVar, Optional
+from typing import Any, Dict, Type, TypeVar, Optional
 from pydantic import BaseModel
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 from .logger import get_logger
+from .llm_cassette import CASSETTE_MODES, TEXT_SCHEMA, LLMCassette, cassette_key, get_cassette
 
 load_dotenv()
 
@@ -13,7 +14,36 @@ logger = get_logger("LLMService")
 T = TypeVar("T", bound=BaseModel)
 
 class LLMService:
-    def __init__(self, model_name: str = "gemini-flash-latest", max_retries: int = 3):
+    """
+    Gemini wrapper with retries and an optional record/replay cassette.
+    LLM_CASSETTE_MODE selects off/record/replay, LLM_CASSETTE_PATH the cassette file and
+    LLM_CASSETTE_SIMULATE_LATENCY=1 replays recorded latencies.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "gemini-flash-latest",
+        max_retries: int = 3,
+        cassette_mode: Optional[str] = None,
+        cassette: Optional[LLMCassette] = None,
+    ):
+        self.max_retries = max_retries
+        self.cassette_mode = (cassette_mode or os.getenv("LLM_CASSETTE_MODE", "off")).lower()
+        if self.cassette_mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown LLM_CASSETTE_MODE '{self.cassette_mode}', expected one of {CASSETTE_MODES}")
+        self.cassette = None
+        if self.cassette_mode != "off":
+            self.cassette = cassette or get_cassette(os.getenv("LLM_CASSETTE_PATH", "cassettes/llm_cassette.json"))
+        self.simulate_latency = os.getenv("LLM_CASSETTE_SIMULATE_LATENCY", "").lower() in ("1", "true", "yes")
+        self._replay_cursor: Dict[str, int] = {}
+
+        if self.cassette_mode == "replay":
+            if not os.path.exists(self.cassette.path):
+                raise RuntimeError(f"LLM cassette {self.cassette.path} not found; record it with LLM_CASSETTE_MODE=record.")
+            logger.info(f"Replaying LLM responses from cassette {self.cassette.path}")
+            self.llm = None
+            return
+
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
             logger.error("GOOGLE_API_KEY not found in environment.")
@@ -27,39 +57,67 @@ class LLMService:
             google_api_key=api_key,
             temperature=0,
         )
-        self.max_retries = max_retries
+
+    def _replay(self, schema_name: str, prompt: str) -> Any:
+        key = cassette_key(schema_name, prompt)
+        index = self._replay_cursor.get(key, 0)
+        self._replay_cursor[key] = index + 1
+        entry = self.cassette.lookup(schema_name, prompt, index)
+        if self.simulate_latency:
+            time.sleep(entry.get("latency", 0))
+        logger.info(f"Replayed {schema_name} response from cassette")
+        return entry["response"]
 
     def generate_content(self, prompt: str) -> str:
+        if self.cassette_mode == "replay":
+            return self._replay(TEXT_SCHEMA, prompt)
+
         last_error = None
         for attempt in range(self.max_retries):
             try:
                 logger.info(f"Generating content (Attempt {attempt + 1})")
+                started = time.perf_counter()
                 response = self.llm.invoke([HumanMessage(content=prompt)])
                 if not response.content:
                     raise RuntimeError("LLM returned empty content.")
-                return response.content
+                latency = time.perf_counter() - started
+                break
             except Exception as e:
                 last_error = e
                 logger.warning(f"LLM attempt {attempt+1} failed: {e}")
                 time.sleep(2 ** attempt) # Exponential backoff
-        
-        logger.error(f"LLM exhausted all {self.max_retries} attempts. Final error: {last_error}")
-        raise RuntimeError(f"LLM Failure after {self.max_retries} retries: {last_error}")
+        else:
+            logger.error(f"LLM exhausted all {self.max_retries} attempts. Final error: {last_error}")
+            raise RuntimeError(f"LLM Failure after {self.max_retries} retries: {last_error}")
+
+        # Recorded outside the retry loop so cassette I/O errors never trigger another model call.
+        if self.cassette_mode == "record":
+            self.cassette.record(TEXT_SCHEMA, prompt, response.content, latency)
+        return response.content
 
     def generate_structured_output(self, prompt: str, schema: Type[T]) -> T:
+        if self.cassette_mode == "replay":
+            return schema.model_validate(self._replay(schema.__name__, prompt))
+
         structured_llm = self.llm.with_structured_output(schema)
         last_error = None
         for attempt in range(self.max_retries):
             try:
                 logger.info(f"Generating structured output for {schema.__name__} (Attempt {attempt + 1})")
+                started = time.perf_counter()
                 result = structured_llm.invoke([HumanMessage(content=prompt)])
                 if not result:
                     raise RuntimeError(f"LLM failed to return structured output for schema {schema.__name__}")
-                return result
+                latency = time.perf_counter() - started
+                break
             except Exception as e:
                 last_error = e
                 logger.warning(f"Structured LLM attempt {attempt+1} failed: {e}")
                 time.sleep(2 ** attempt)
-        
-        logger.error(f"Structured LLM exhausted all {self.max_retries} attempts for {schema.__name__}. Final error: {last_error}")
-        raise RuntimeError(f"Structured LLM Failure after {self.max_retries} retries for {schema.__name__}: {last_error}")
+        else:
+            logger.error(f"Structured LLM exhausted all {self.max_retries} attempts for {schema.__name__}. Final error: {last_error}")
+            raise RuntimeError(f"Structured LLM Failure after {self.max_retries} retries for {schema.__name__}: {last_error}")
+
+        if self.cassette_mode == "record":
+            self.cassette.record(schema.__name__, prompt, result.model_dump(mode="json"), latency)
+        return result
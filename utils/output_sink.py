@@ -0,0 +1,161 @@
+import json
+from abc import ABC, abstractmethod
+import os
+import re
+import sqlite3
+from typing import Any, Dict, List, Set
+from .logger import get_logger
+from .fileio import atomic_write
+
+logger = get_logger("OutputSink")
+
+SINK_TYPES = ("dir", "ndjson", "sqlite")
+
+def product_slug(name: str) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", str(name).lower()).strip("-")
+    return slug or "product"
+
+def dump_json(content: Any, compact: bool = False) -> str:
+    if compact:
+        return json.dumps(content, separators=(",", ":"), ensure_ascii=False)
+    return json.dumps(content, indent=2, ensure_ascii=False)
+
+class OutputSink(ABC):
+    """
+    Destination for assembled pages. Use as a context manager so buffered pages are committed.
+    Products are keyed by the slug of a stable product id; ids that collide within one
+    sink session get a numeric suffix instead of overwriting each other.
+    """
+
+    def __init__(self):
+        self._claimed_keys: Set[str] = set()
+
+    def _claim_key(self, product_id: str) -> str:
+        base = product_slug(product_id)
+        key, suffix = base, 2
+        while key in self._claimed_keys:
+            key, suffix = f"{base}-{suffix}", suffix + 1
+        if key != base:
+            logger.warning(f"Product key '{base}' already written in this run; using '{key}'")
+        self._claimed_keys.add(key)
+        return key
+
+    @abstractmethod
+    def write(self, product_id: str, title: str, pages: Dict[str, Any]):
+        ...
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class DirectorySink(OutputSink):
+    """One JSON file per page, under <root>/<product-key>/ unless per_product is False."""
+
+    def __init__(self, root: str = "output", per_product: bool = True, compact: bool = False):
+        super().__init__()
+        self.root = root
+        self.per_product = per_product
+        self.compact = compact
+
+    def write(self, product_id: str, title: str, pages: Dict[str, Any]):
+        directory = os.path.join(self.root, self._claim_key(product_id)) if self.per_product else self.root
+        for filename, content in pages.items():
+            out_path = os.path.join(directory, filename)
+            atomic_write(out_path, dump_json(content, self.compact))
+            logger.info(f"Saved: {out_path}")
+
+class NDJSONSink(OutputSink):
+    """
+    Buffers one compact record per page and writes complete shards
+    (<root>/pages-00000.ndjson, ...) of shard_size products each, so a
+    product's pages never span two shards.
+    """
+
+    def __init__(self, root: str = "output", shard_size: int = 300):
+        super().__init__()
+        self.root = root
+        self.shard_size = shard_size
+        self._buffer: List[str] = []
+        self._buffered_products = 0
+        self._shard_index = self._next_shard_index()
+
+    def _next_shard_index(self) -> int:
+        if not os.path.isdir(self.root):
+            return 0
+        existing = [int(m.group(1)) for m in (re.match(r"pages-(\d+)\.ndjson$", f) for f in os.listdir(self.root)) if m]
+        return max(existing) + 1 if existing else 0
+
+    def write(self, product_id: str, title: str, pages: Dict[str, Any]):
+        key = self._claim_key(product_id)
+        for filename, content in pages.items():
+            record = {"product": key, "title": title, "page": filename, "content": content}
+            self._buffer.append(dump_json(record, compact=True))
+        self._buffered_products += 1
+        if self._buffered_products >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        out_path = os.path.join(self.root, f"pages-{self._shard_index:05d}.ndjson")
+        atomic_write(out_path, "\n".join(self._buffer) + "\n")
+        logger.info(f"Saved shard: {out_path} ({len(self._buffer)} records)")
+        self._buffer = []
+        self._buffered_products = 0
+        self._shard_index += 1
+
+    def close(self):
+        self.flush()
+
+class SQLiteSink(OutputSink):
+    """Stores pages in a `pages` table, committing batch_size products per transaction."""
+
+    def __init__(self, path: str = "output/pages.db", batch_size: int = 100):
+        super().__init__()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[tuple] = []
+        self._pending_products = 0
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "product TEXT NOT NULL, title TEXT NOT NULL, page TEXT NOT NULL, content TEXT NOT NULL, "
+            "PRIMARY KEY (product, page))"
+        )
+        self.conn.commit()
+
+    def write(self, product_id: str, title: str, pages: Dict[str, Any]):
+        key = self._claim_key(product_id)
+        self._pending.extend((key, title, filename, dump_json(content, compact=True)) for filename, content in pages.items())
+        self._pending_products += 1
+        if self._pending_products >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO pages (product, title, page, content) VALUES (?, ?, ?, ?)", self._pending)
+        logger.info(f"Committed {len(self._pending)} pages to {self.path}")
+        self._pending = []
+        self._pending_products = 0
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+def create_sink(kind: str, output_dir: str, compact: bool = False) -> OutputSink:
+    if kind == "dir":
+        return DirectorySink(output_dir, compact=compact)
+    if kind == "ndjson":
+        return NDJSONSink(output_dir)
+    if kind == "sqlite":
+        return SQLiteSink(os.path.join(output_dir, "pages.db"))
+    raise ValueError(f"Unknown output sink '{kind}', expected one of {SINK_TYPES}")